@@ -1,24 +1,85 @@
 import customtkinter as ctk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, ttk, Menu
 import sqlite3
+import base64
+import functools
 import hashlib
+import hmac
 import re
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.request import pathname2url
 from datetime import datetime
 import secrets
 import string
 
+# Движок регулярных выражений: RE2 (DFA без возвратов), если установлен google-re2
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
+# Предкомпилированные шаблоны валидации
+_USERNAME_RE = regex_engine.compile(r'^[a-zA-Z0-9_]+$')
+_EMAIL_RE = regex_engine.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Функции хеширования паролей с зафиксированными параметрами
+_scrypt = functools.partial(hashlib.scrypt, n=2**14, r=8, p=1, dklen=32)
+_legacy_pbkdf2 = functools.partial(hashlib.pbkdf2_hmac, 'sha256', iterations=100000)
+
+# Алфавит для генерации паролей
+_PW_ALPHABET = tuple(string.ascii_letters + string.digits + string.punctuation)
+_PW_N = len(_PW_ALPHABET)
+
 class Database:
+    READ_POOL_SIZE = 3  # Количество соединений только для чтения
+    
     def __init__(self, db_name="users.db"):
         self.db_name = db_name
         self.init_db()
     
     def init_db(self):
         """Инициализация базы данных с защитой от SQL-инъекций"""
-        self.conn = sqlite3.connect(self.db_name)
-        self.conn.execute("PRAGMA foreign_keys = ON")
-        self.cursor = self.conn.cursor()
+        # Одно соединение для записи, доступное из любого потока под блокировкой
+        self.write_conn = self.connect(self.db_name)
+        self.write_lock = threading.Lock()
+        # WAL и ослабленная синхронизация: дешёвые коммиты, чтение не блокирует запись.
+        # Файлы .db-wal/.db-shm учитываются при резервном копировании через conn.backup()
+        self.write_conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+        """)
         self.create_tables()
+        
+        # Пул соединений только для чтения: в режиме WAL читают параллельно с записью
+        read_uri = f"file:{pathname2url(os.path.abspath(self.db_name))}?mode=ro"
+        self.read_conns = queue.Queue()
+        for _ in range(self.READ_POOL_SIZE):
+            self.read_conns.put(self.connect(read_uri, uri=True))
+    
+    def connect(self, database, uri=False):
+        """Открытие соединения с общими настройками"""
+        conn = sqlite3.connect(database, uri=uri, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA foreign_keys = ON;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA mmap_size = 134217728;
+            PRAGMA cache_size = -16000;
+        """)
+        return conn
+    
+    @contextmanager
+    def read_connection(self):
+        """Выдача свободного соединения для чтения из пула"""
+        conn = self.read_conns.get()
+        try:
+            yield conn
+        finally:
+            self.read_conns.put(conn)
     
     def create_tables(self):
         """Создание таблиц с индексами для улучшения производительности"""
@@ -34,12 +95,12 @@ class Database:
                 is_active INTEGER DEFAULT 1
             )
             ''',
+            # Метаданные записей отдельно от содержимого: списки не читают страницы с текстом
             '''
-            CREATE TABLE IF NOT EXISTS user_data (
+            CREATE TABLE IF NOT EXISTS user_data_meta (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id INTEGER,
                 title TEXT,
-                data TEXT,
                 category TEXT DEFAULT 'General',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -47,6 +108,13 @@ class Database:
             )
             ''',
             '''
+            CREATE TABLE IF NOT EXISTS user_data_blob (
+                id INTEGER PRIMARY KEY,
+                data TEXT,
+                FOREIGN KEY (id) REFERENCES user_data_meta (id) ON DELETE CASCADE
+            )
+            ''',
+            '''
             CREATE TABLE IF NOT EXISTS login_attempts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT,
@@ -57,55 +125,112 @@ class Database:
             '''
         ]
         
-        for table in tables:
-            self.cursor.execute(table)
+        # Перед переносом данных старой схемы делается резервная копия
+        legacy = self.has_legacy_user_data()
+        if legacy:
+            success, message = BackupManager.create_backup(self.db_name, suffix="_before_migration")
+            if not success:
+                raise RuntimeError(f"Миграция данных отменена: {message}")
+        
+        with self.write_lock, self.write_conn:
+            # Явная транзакция: CREATE TABLE сам по себе её не открывает
+            self.write_conn.execute("BEGIN")
+            for table in tables:
+                self.write_conn.execute(table)
+            if legacy:
+                self.migrate_user_data()
         
         # Создание индексов
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
-            "CREATE INDEX IF NOT EXISTS idx_user_data_user_id ON user_data(user_id)",
+            # Частичный индекс не используется: поиск по username идёт по UNIQUE-индексу
+            "DROP INDEX IF EXISTS idx_users_active_username",
+            # Составные индексы покрывают фильтр по user_id/category и сортировку по дате;
+            # id разрешает совпадения created_at, чтобы страницы списка не пересекались
+            "CREATE INDEX IF NOT EXISTS idx_user_data_meta_user_created_id ON user_data_meta(user_id, created_at DESC, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_user_data_meta_user_category_id ON user_data_meta(user_id, category, created_at DESC, id DESC)",
+            # Прежние индексы без id
+            "DROP INDEX IF EXISTS idx_user_data_meta_user_created",
+            "DROP INDEX IF EXISTS idx_user_data_meta_user_category",
             "CREATE INDEX IF NOT EXISTS idx_login_attempts_time ON login_attempts(attempt_time)"
         ]
         
-        for index in indexes:
-            try:
-                self.cursor.execute(index)
-            except:
-                pass
-        
-        self.conn.commit()
+        with self.write_lock, self.write_conn:
+            for index in indexes:
+                try:
+                    self.write_conn.execute(index)
+                except:
+                    pass
+    
+    def has_legacy_user_data(self):
+        """Проверка наличия таблицы user_data старой схемы"""
+        cur = self.write_conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_data'")
+        return cur.fetchone() is not None
+    
+    def migrate_user_data(self):
+        """Перенос записей из старой таблицы user_data в user_data_meta/user_data_blob"""
+        self.write_conn.execute('''
+            INSERT INTO user_data_meta (id, user_id, title, category, created_at, updated_at)
+            SELECT id, user_id, title, category, created_at, updated_at FROM user_data
+        ''')
+        self.write_conn.execute("INSERT INTO user_data_blob (id, data) SELECT id, data FROM user_data")
+        self.write_conn.execute("DROP TABLE user_data")
     
     def hash_password(self, password, salt=None):
-        """Хеширование пароля с солью"""
+        """Хеширование пароля с солью (scrypt)"""
         if salt is None:
-            salt = secrets.token_hex(16)
-        hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return f"{salt}${hashed.hex()}"
+            salt = secrets.token_bytes(16)
+        hashed = _scrypt(password.encode(), salt=salt)
+        return f"scrypt${base64.b64encode(salt).decode()}${base64.b64encode(hashed).decode()}"
+    
+    def needs_rehash(self, stored_password):
+        """Проверка, сохранён ли пароль в устаревшем формате PBKDF2"""
+        return not stored_password.startswith('scrypt$')
     
     def verify_password(self, stored_password, provided_password):
         """Проверка пароля"""
-        salt, hashed = stored_password.split('$')
-        new_hash = self.hash_password(provided_password, salt)
-        return new_hash == stored_password
+        if self.needs_rehash(stored_password):
+            # Устаревший формат: salt$hex(pbkdf2_sha256)
+            salt, hashed = stored_password.split('$')
+            new_hash = _legacy_pbkdf2(provided_password.encode(), salt.encode())
+            expected = bytes.fromhex(hashed)
+        else:
+            _, salt, hashed = stored_password.split('$')
+            new_hash = _scrypt(provided_password.encode(), salt=base64.b64decode(salt))
+            expected = base64.b64decode(hashed)
+        # Сравнение за постоянное время, без утечки по времени ответа
+        return hmac.compare_digest(new_hash, expected)
+    
+    def verify_batch(self, stored_password, candidates):
+        """Пакетная проверка паролей-кандидатов (аудит, миграция хешей)"""
+        # hashlib отпускает GIL при вычислении ключа, поэтому потоки
+        # распределяют проверки по всем ядрам
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return list(executor.map(lambda candidate: self.verify_password(stored_password, candidate),
+                                     candidates))
     
     def register_user(self, username, password, email):
         """Регистрация пользователя с проверкой уникальности"""
         try:
-            # Проверка существования пользователя
-            self.cursor.execute("SELECT id FROM users WHERE username = ? OR email = ?", 
-                               (username, email))
-            if self.cursor.fetchone():
-                return False, "Пользователь с таким именем или email уже существует"
-            
-            # Хеширование пароля
+            # Хеширование пароля до начала транзакции, чтобы не держать блокировку
             hashed_password = self.hash_password(password)
             
-            self.cursor.execute('''
-                INSERT INTO users (username, password, email)
-                VALUES (?, ?, ?)
-            ''', (username, hashed_password, email))
+            # Проверка и вставка в одной транзакции
+            with self.write_lock, self.write_conn:
+                self.write_conn.execute("BEGIN IMMEDIATE")
+                
+                # Проверка существования пользователя
+                cur = self.write_conn.execute("SELECT id FROM users WHERE username = ? OR email = ?", 
+                                        (username, email))
+                if cur.fetchone():
+                    return False, "Пользователь с таким именем или email уже существует"
+                
+                self.write_conn.execute('''
+                    INSERT INTO users (username, password, email)
+                    VALUES (?, ?, ?)
+                ''', (username, hashed_password, email))
             
-            self.conn.commit()
             return True, "Регистрация успешна"
             
         except sqlite3.Error as e:
@@ -114,26 +239,37 @@ class Database:
     def login_user(self, username, password):
         """Аутентификация пользователя с записью попыток входа"""
         try:
-            self.cursor.execute('''
-                SELECT id, username, password, is_active FROM users 
-                WHERE username = ? AND is_active = 1
-            ''', (username,))
+            with self.read_connection() as conn:
+                user = conn.execute('''
+                    SELECT id, username, password, is_active,
+                           last_login IS NULL OR last_login < datetime('now', '-60 seconds') AS login_stale
+                    FROM users 
+                    WHERE username = ? AND is_active = 1
+                ''', (username,)).fetchone()
             
-            user = self.cursor.fetchone()
             if not user:
                 return False, "Пользователь не найден или заблокирован"
             
-            if self.verify_password(user[2], password):
-                # Обновление времени последнего входа
-                self.cursor.execute('''
-                    UPDATE users SET last_login = CURRENT_TIMESTAMP 
-                    WHERE id = ?
-                ''', (user[0],))
-                self.conn.commit()
+            if self.verify_password(user['password'], password):
+                # Миграция пароля со старого PBKDF2 на scrypt
+                new_password = self.hash_password(password) if self.needs_rehash(user['password']) else None
+                
+                # Повторный вход в течение минуты не пишет в базу
+                if new_password or user['login_stale']:
+                    with self.write_lock, self.write_conn:
+                        if new_password:
+                            self.write_conn.execute("UPDATE users SET password = ? WHERE id = ?",
+                                                    (new_password, user['id']))
+                        
+                        # Обновление времени последнего входа
+                        self.write_conn.execute('''
+                            UPDATE users SET last_login = CURRENT_TIMESTAMP 
+                            WHERE id = ?
+                        ''', (user['id'],))
                 
                 return True, {
-                    'id': user[0],
-                    'username': user[1]
+                    'id': user['id'],
+                    'username': user['username']
                 }
             else:
                 return False, "Неверный пароль"
@@ -143,53 +279,96 @@ class Database:
     
     def save_user_data(self, user_id, title, data, category="General"):
         """Сохранение данных пользователя"""
+        return self.save_user_data_many(user_id, [(title, data, category)])
+    
+    def save_user_data_many(self, user_id, rows):
+        """Пакетное сохранение записей (title, data, category) одной транзакцией"""
         try:
-            self.cursor.execute('''
-                INSERT INTO user_data (user_id, title, data, category)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, title, data, category))
-            self.conn.commit()
+            with self.write_lock, self.write_conn:
+                for title, data, category in rows:
+                    cur = self.write_conn.execute('''
+                        INSERT INTO user_data_meta (user_id, title, category)
+                        VALUES (?, ?, ?)
+                    ''', (user_id, title, category))
+                    self.write_conn.execute("INSERT INTO user_data_blob (id, data) VALUES (?, ?)",
+                                            (cur.lastrowid, data))
             return True
         except sqlite3.Error:
             return False
     
-    def get_user_data(self, user_id, category=None):
-        """Получение данных пользователя с фильтрацией по категории"""
+    def get_user_data_preview(self, user_id, category=None, limit=None, offset=0):
+        """Укороченные записи для списка: только метаданные, обрезка выполняется в SQL"""
+        # LIMIT -1 в SQLite означает "без ограничения"
+        page = (-1 if limit is None else limit, offset)
         try:
-            if category:
-                self.cursor.execute('''
-                    SELECT id, title, data, category, created_at 
-                    FROM user_data 
-                    WHERE user_id = ? AND category = ?
-                    ORDER BY created_at DESC
-                ''', (user_id, category))
-            else:
-                self.cursor.execute('''
-                    SELECT id, title, data, category, created_at 
-                    FROM user_data 
-                    WHERE user_id = ? 
-                    ORDER BY created_at DESC
-                ''', (user_id,))
+            with self.read_connection() as conn:
+                if category:
+                    cur = conn.execute('''
+                        SELECT id, substr(title, 1, 23) AS title,
+                               category, substr(created_at, 1, 10) AS created_date
+                        FROM user_data_meta 
+                        WHERE user_id = ? AND category = ?
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT ? OFFSET ?
+                    ''', (user_id, category) + page)
+                else:
+                    cur = conn.execute('''
+                        SELECT id, substr(title, 1, 23) AS title,
+                               category, substr(created_at, 1, 10) AS created_date
+                        FROM user_data_meta 
+                        WHERE user_id = ? 
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT ? OFFSET ?
+                    ''', (user_id,) + page)
             
-            return self.cursor.fetchall()
+                return cur.fetchall()
         except sqlite3.Error:
             return []
     
+    def get_full_data(self, user_id, data_id):
+        """Получение одной записи целиком"""
+        try:
+            with self.read_connection() as conn:
+                cur = conn.execute('''
+                    SELECT m.id, m.title, b.data, m.category, m.created_at 
+                    FROM user_data_meta m JOIN user_data_blob b ON b.id = m.id 
+                    WHERE m.id = ? AND m.user_id = ?
+                ''', (data_id, user_id))
+                return cur.fetchone()
+        except sqlite3.Error:
+            return None
+    
+    def get_dashboard_stats(self, user_id):
+        """Статистика для главной панели одним запросом: (записей, категорий, последняя запись)"""
+        try:
+            with self.read_connection() as conn:
+                cur = conn.execute('''
+                    SELECT COUNT(*), COUNT(DISTINCT category), MAX(created_at) 
+                    FROM user_data_meta WHERE user_id = ?
+                ''', (user_id,))
+                return tuple(cur.fetchone())
+        except sqlite3.Error:
+            return 0, 0, None
+    
     def get_categories(self, user_id):
         """Получение списка категорий пользователя"""
         try:
-            self.cursor.execute('''
-                SELECT DISTINCT category FROM user_data 
-                WHERE user_id = ? ORDER BY category
-            ''', (user_id,))
-            return [row[0] for row in self.cursor.fetchall()]
+            with self.read_connection() as conn:
+                cur = conn.execute('''
+                    SELECT DISTINCT category FROM user_data_meta 
+                    WHERE user_id = ? ORDER BY category
+                ''', (user_id,))
+                return [row['category'] for row in cur.fetchall()]
         except sqlite3.Error:
             return []
     
     def close(self):
-        """Закрытие соединения с базой данных"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        """Закрытие соединений с базой данных"""
+        if hasattr(self, 'read_conns'):
+            while not self.read_conns.empty():
+                self.read_conns.get_nowait().close()
+        if hasattr(self, 'write_conn'):
+            self.write_conn.close()
 
 class Validator:
     """Класс для валидации данных"""
@@ -198,7 +377,7 @@ class Validator:
     def validate_username(username):
         if len(username) < 3:
             return False, "Имя пользователя должно содержать минимум 3 символа"
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+        if not _USERNAME_RE.match(username):
             return False, "Имя пользователя может содержать только буквы, цифры и _"
         return True, ""
     
@@ -206,26 +385,35 @@ class Validator:
     def validate_password(password):
         if len(password) < 6:
             return False, "Пароль должен содержать минимум 6 символов"
-        if not any(char.isdigit() for char in password):
+        # Один проход по строке вместо отдельного на каждую проверку
+        has_digit = has_upper = False
+        for char in password:
+            if char.isdigit():
+                has_digit = True
+            elif char.isupper():
+                has_upper = True
+            if has_digit and has_upper:
+                break
+        if not has_digit:
             return False, "Пароль должен содержать хотя бы одну цифру"
-        if not any(char.isupper() for char in password):
+        if not has_upper:
             return False, "Пароль должен содержать хотя бы одну заглавную букву"
         return True, ""
     
     @staticmethod
     def validate_email(email):
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if not _EMAIL_RE.match(email):
             return False, "Некорректный email адрес"
         return True, ""
     
     @staticmethod
     def generate_strong_password(length=12):
         """Генерация сильного пароля"""
-        characters = string.ascii_letters + string.digits + string.punctuation
-        return ''.join(secrets.choice(characters) for _ in range(length))
+        return ''.join(_PW_ALPHABET[secrets.randbelow(_PW_N)] for _ in range(length))
 
 class ModernApp:
+    PAGE_SIZE = 50  # Количество записей, загружаемых за один раз
+    
     def __init__(self):
         # Настройка темы
         ctk.set_appearance_mode("System")
@@ -240,6 +428,15 @@ class ModernApp:
         self.db = Database()
         self.current_user = None
         
+        # Фреймы экранов создаются один раз и затем только переключаются
+        self.frames = {'login': None, 'register': None, 'main': None}
+        self.frame_builders = {
+            'login': self.build_login_frame,
+            'register': self.build_register_frame,
+            'main': self.build_main_frame
+        }
+        self.current_frame = None
+        
         self.setup_styles()
         self.show_login_frame()
     
@@ -253,19 +450,59 @@ class ModernApp:
             'button_width': 200,
             'entry_width': 300
         }
+        
+        # Стиль таблицы записей (ttk.Treeview); в clam цвета фона применяются на всех платформах
+        ttk.Style().theme_use('clam')
+        self.apply_tree_style(ctk.get_appearance_mode())
+        # Перекраска таблицы вместе с виджетами CTk при смене темы системы
+        ctk.AppearanceModeTracker.add(self.apply_tree_style, self.root)
     
-    def clear_window(self):
-        """Очистка окна"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def apply_tree_style(self, appearance_mode):
+        """Цвета ttk.Treeview по режиму оформления CTk ("Light" или "Dark")"""
+        theme = ctk.ThemeManager.theme
+        mode = 0 if appearance_mode == "Light" else 1
+        background = theme['CTkFrame']['top_fg_color'][mode]
+        foreground = theme['CTkLabel']['text_color'][mode]
+        selected = theme['CTkButton']['fg_color'][mode]
+        
+        tree_style = ttk.Style()
+        tree_style.configure("Treeview", rowheight=28, font=self.style['font_small'],
+                             background=background, fieldbackground=background,
+                             foreground=foreground, borderwidth=0)
+        tree_style.map("Treeview", background=[('selected', selected)],
+                       foreground=[('selected', theme['CTkButton']['text_color'][mode])])
+        tree_style.configure("Treeview.Heading", font=self.style['font_main'],
+                             background=theme['CTkFrame']['fg_color'][mode],
+                             foreground=foreground, relief='flat')
+        tree_style.map("Treeview.Heading", background=[('active', theme['CTkFrame']['border_color'][mode])])
+    
+    def show_frame(self, name):
+        """Переключение на фрейм экрана (создаётся при первом показе)"""
+        if self.frames[name] is None:
+            self.frames[name] = self.frame_builders[name]()
+        
+        if self.current_frame is not None:
+            self.current_frame.pack_forget()
+        
+        padding = 0 if name == 'main' else 50
+        self.current_frame = self.frames[name]
+        self.current_frame.pack(expand=True, fill='both', padx=padding, pady=padding)
     
     def show_login_frame(self):
         """Отображение формы входа"""
-        self.clear_window()
+        self.show_frame('login')
+        self.login_password.delete(0, 'end')
+        
+        # Установка фокуса
+        self.login_username.focus()
         
+        # Бинд Enter для входа
+        self.root.bind('<Return>', lambda e: self.login())
+    
+    def build_login_frame(self):
+        """Создание формы входа"""
         # Основной фрейм
         main_frame = ctk.CTkFrame(self.root)
-        main_frame.pack(expand=True, fill='both', padx=50, pady=50)
         
         # Заголовок
         title_label = ctk.CTkLabel(main_frame, text="Вход в систему", 
@@ -299,18 +536,21 @@ class ModernApp:
                       width=self.style['button_width'], font=self.style['font_main'],
                       fg_color="transparent", border_width=2).pack(pady=10)
         
-        # Установка фокуса
-        self.login_username.focus()
-        
-        # Бинд Enter для входа
-        self.root.bind('<Return>', lambda e: self.login())
+        return main_frame
     
     def show_register_frame(self):
         """Отображение формы регистрации"""
-        self.clear_window()
+        self.root.unbind('<Return>')
+        self.show_frame('register')
         
+        # Очистка полей от предыдущего ввода
+        for entry in self.reg_fields.values():
+            entry.delete(0, 'end')
+        self.reg_fields['reg_username'].focus()
+    
+    def build_register_frame(self):
+        """Создание формы регистрации"""
         main_frame = ctk.CTkFrame(self.root)
-        main_frame.pack(expand=True, fill='both', padx=50, pady=50)
         
         title_label = ctk.CTkLabel(main_frame, text="Регистрация", 
                                   font=self.style['font_title'])
@@ -352,19 +592,29 @@ class ModernApp:
         ctk.CTkButton(button_frame, text="Назад", command=self.show_login_frame,
                       width=self.style['button_width'], font=self.style['font_main'],
                       fg_color="transparent", border_width=2).pack(pady=10)
+        
+        return main_frame
     
     def show_main_app(self):
         """Отображение главного интерфейса приложения"""
-        self.clear_window()
+        self.root.unbind('<Return>')
+        self.show_frame('main')
+        self.welcome_label.configure(text=f"Добро пожаловать,\n{self.current_user['username']}!")
+        
+        # Показываем dashboard по умолчанию
+        self.show_dashboard()
+    
+    def build_main_frame(self):
+        """Создание главного интерфейса приложения"""
+        main_frame = ctk.CTkFrame(self.root, fg_color="transparent")
         
         # Создание боковой панели
-        sidebar = ctk.CTkFrame(self.root, width=200)
+        sidebar = ctk.CTkFrame(main_frame, width=200)
         sidebar.pack(side='left', fill='y', padx=10, pady=10)
         
         # Приветствие
-        welcome_label = ctk.CTkLabel(sidebar, text=f"Добро пожаловать,\n{self.current_user['username']}!",
-                                    font=self.style['font_main'])
-        welcome_label.pack(pady=20)
+        self.welcome_label = ctk.CTkLabel(sidebar, text="", font=self.style['font_main'])
+        self.welcome_label.pack(pady=20)
         
         # Кнопки навигации
         ctk.CTkButton(sidebar, text="Добавить запись", command=self.show_add_data_frame,
@@ -376,12 +626,11 @@ class ModernApp:
         ctk.CTkButton(sidebar, text="Выйти", command=self.logout,
                      font=self.style['font_main'], fg_color="#d9534f").pack(pady=20, fill='x')
         
-        # Основная область
-        self.main_area = ctk.CTkFrame(self.root)
+        # Основная область: её содержимое пересоздаётся, т.к. зависит от данных
+        self.main_area = ctk.CTkFrame(main_frame)
         self.main_area.pack(side='right', expand=True, fill='both', padx=10, pady=10)
         
-        # Показываем dashboard по умолчанию
-        self.show_dashboard()
+        return main_frame
     
     def show_dashboard(self):
         """Показ dashboard"""
@@ -396,13 +645,12 @@ class ModernApp:
         stats_frame = ctk.CTkFrame(self.main_area)
         stats_frame.pack(pady=20, padx=20, fill='x')
         
-        user_data = self.db.get_user_data(self.current_user['id'])
-        categories = self.db.get_categories(self.current_user['id'])
+        total, n_categories, last_created = self.db.get_dashboard_stats(self.current_user['id'])
         
         stats_text = f"""
-        Общее количество записей: {len(user_data)}
-        Количество категорий: {len(categories)}
-        Последняя запись: {user_data[0][4][:10] if user_data else 'Нет записей'}
+        Общее количество записей: {total}
+        Количество категорий: {n_categories}
+        Последняя запись: {last_created[:10] if last_created else 'Нет записей'}
         """
         
         stats_label = ctk.CTkLabel(stats_frame, text=stats_text, 
@@ -482,56 +730,114 @@ class ModernApp:
                                                  command=lambda c: self.show_data_list(c if c != "Все" else None))
             category_dropdown.pack(side='left', padx=10)
         
-        # Таблица с записями
-        data = self.db.get_user_data(self.current_user['id'], category)
+        # Таблица с записями (первая страница)
+        data = self.db.get_user_data_preview(self.current_user['id'], category, limit=self.PAGE_SIZE)
         
         if not data:
             ctk.CTkLabel(self.main_area, text="Записей не найдено", 
                         font=self.style['font_main']).pack(pady=50)
             return
         
-        # Создание таблицы
-        table_frame = ctk.CTkScrollableFrame(self.main_area, width=800, height=400)
+        # Создание таблицы: Treeview - один виджет на весь список вместо набора виджетов на строку
+        table_frame = ctk.CTkFrame(self.main_area)
         table_frame.pack(pady=20, padx=20, fill='both', expand=True)
         
+        columns = ("title", "category", "created_at")
+        self.data_tree = ttk.Treeview(table_frame, columns=columns, show='headings', selectmode='browse')
+        
         # Заголовки таблицы
-        headers = ["Заголовок", "Категория", "Дата создания", "Действия"]
-        for i, header in enumerate(headers):
-            label = ctk.CTkLabel(table_frame, text=header, font=self.style['font_main'], 
-                                width=150 if i < 3 else 100)
-            label.grid(row=0, column=i, padx=5, pady=10, sticky='w')
-        
-        # Данные таблицы
-        for row_idx, (data_id, title, content, category, created_at) in enumerate(data, 1):
+        headers = ["Заголовок", "Категория", "Дата создания"]
+        for column, header in zip(columns, headers):
+            self.data_tree.heading(column, text=header, anchor='w')
+            self.data_tree.column(column, width=200, anchor='w')
+        
+        # Следующая страница подгружается при прокрутке до конца списка
+        scrollbar = ctk.CTkScrollbar(table_frame, command=self.data_tree.yview)
+        self.data_tree.configure(yscrollcommand=lambda first, last: self.on_data_scroll(scrollbar, first, last))
+        scrollbar.pack(side='right', fill='y')
+        self.data_tree.pack(side='left', fill='both', expand=True)
+        
+        # Действия с записями: двойной клик, контекстное меню и кнопки для выделенной строки
+        self.data_menu = Menu(self.data_tree, tearoff=0)
+        self.data_menu.add_command(label="Открыть", command=lambda: self.on_data_action(self.show_data_detail))
+        self.data_menu.add_command(label="Редактировать", command=lambda: self.on_data_action(self.edit_data))
+        self.data_menu.add_command(label="Удалить", command=lambda: self.on_data_action(self.delete_data))
+        
+        self.data_tree.bind('<Double-1>', self.on_data_double_click)
+        self.data_tree.bind('<Return>', lambda e: self.on_data_action(self.show_data_detail))
+        self.data_tree.bind('<Delete>', lambda e: self.on_data_action(self.delete_data))
+        self.data_tree.bind('<Button-3>', self.show_data_menu)
+        
+        action_frame = ctk.CTkFrame(self.main_area, fg_color="transparent")
+        action_frame.pack(pady=(0, 20))
+        
+        ctk.CTkButton(action_frame, text="👁 Открыть", width=120,
+                     command=lambda: self.on_data_action(self.show_data_detail)).pack(side='left', padx=5)
+        
+        ctk.CTkButton(action_frame, text="✏️ Редактировать", width=120,
+                     command=lambda: self.on_data_action(self.edit_data)).pack(side='left', padx=5)
+        
+        ctk.CTkButton(action_frame, text="🗑️ Удалить", width=120, fg_color="#d9534f",
+                     command=lambda: self.on_data_action(self.delete_data)).pack(side='left', padx=5)
+        
+        # Состояние постраничной загрузки
+        self.data_list_category = category
+        self.data_list_offset = 0
+        self.data_list_complete = False
+        self.add_data_rows(data)
+    
+    def add_data_rows(self, data):
+        """Добавление страницы записей в таблицу"""
+        for data_id, title, category_name, created_date in data:
             # Обрезаем длинный текст
             short_title = title[:20] + "..." if len(title) > 20 else title
-            short_content = content[:30] + "..." if len(content) > 30 else content
-            
-            ctk.CTkLabel(table_frame, text=short_title, font=self.style['font_small'],
-                        width=150).grid(row=row_idx, column=0, padx=5, pady=5, sticky='w')
-            
-            ctk.CTkLabel(table_frame, text=category, font=self.style['font_small'],
-                        width=150).grid(row=row_idx, column=1, padx=5, pady=5, sticky='w')
-            
-            ctk.CTkLabel(table_frame, text=created_at[:10], font=self.style['font_small'],
-                        width=150).grid(row=row_idx, column=2, padx=5, pady=5, sticky='w')
-            
-            # Кнопки действий
-            action_frame = ctk.CTkFrame(table_frame, fg_color="transparent")
-            action_frame.grid(row=row_idx, column=3, padx=5, pady=5)
-            
-            ctk.CTkButton(action_frame, text="👁", width=30, height=30,
-                         command=lambda d=(data_id, title, content, category, created_at): 
-                         self.show_data_detail(d)).pack(side='left', padx=2)
-            
-            ctk.CTkButton(action_frame, text="✏️", width=30, height=30,
-                         command=lambda d=data_id: self.edit_data(d)).pack(side='left', padx=2)
-            
-            ctk.CTkButton(action_frame, text="🗑️", width=30, height=30, fg_color="#d9534f",
-                         command=lambda d=data_id: self.delete_data(d)).pack(side='left', padx=2)
+            self.data_tree.insert('', 'end', iid=data_id, values=(short_title, category_name, created_date))
+        
+        self.data_list_offset += len(data)
+        self.data_list_complete = len(data) < self.PAGE_SIZE
+    
+    def load_more_data(self):
+        """Загрузка следующей страницы записей"""
+        data = self.db.get_user_data_preview(self.current_user['id'], self.data_list_category,
+                                             limit=self.PAGE_SIZE, offset=self.data_list_offset)
+        self.add_data_rows(data)
+    
+    def on_data_scroll(self, scrollbar, first, last):
+        """Синхронизация полосы прокрутки и подгрузка при достижении конца списка"""
+        scrollbar.set(first, last)
+        if float(last) >= 1.0 and not self.data_list_complete:
+            self.load_more_data()
+    
+    def show_data_menu(self, event):
+        """Контекстное меню строки таблицы"""
+        row = self.data_tree.identify_row(event.y)
+        if row:
+            self.data_tree.selection_set(row)
+            try:
+                self.data_menu.tk_popup(event.x_root, event.y_root)
+            finally:
+                self.data_menu.grab_release()
+    
+    def on_data_double_click(self, event):
+        """Открытие записи двойным кликом по строке (не по заголовку)"""
+        if self.data_tree.identify_region(event.x, event.y) == 'cell':
+            self.on_data_action(self.show_data_detail)
+    
+    def on_data_action(self, action):
+        """Выполнение действия над выделенной записью"""
+        selection = self.data_tree.selection()
+        if not selection:
+            messagebox.showinfo("Инфо", "Выберите запись в таблице")
+            return
+        action(int(selection[0]))
     
-    def show_data_detail(self, data):
+    def show_data_detail(self, data_id):
         """Показ детальной информации о записи"""
+        # Полный текст загружается только при открытии записи
+        data = self.db.get_full_data(self.current_user['id'], data_id)
+        if not data:
+            messagebox.showerror("Ошибка", "Запись не найдена")
+            return
         data_id, title, content, category, created_at = data
         
         for widget in self.main_area.winfo_children():
@@ -589,6 +895,8 @@ class ModernApp:
         success, result = self.db.login_user(username, password)
         
         if success:
+            # Фрейм входа кешируется, пароль не должен оставаться в скрытом поле
+            self.login_password.delete(0, 'end')
             self.current_user = result
             self.show_main_app()
         else:
@@ -626,6 +934,9 @@ class ModernApp:
         success, message = self.db.register_user(username, password, email)
         
         if success:
+            # Фрейм регистрации кешируется, пароли не должны оставаться в скрытых полях
+            self.reg_fields['reg_password'].delete(0, 'end')
+            self.reg_fields['reg_confirm_password'].delete(0, 'end')
             messagebox.showinfo("Успех", message)
             self.show_login_frame()
         else:
@@ -665,6 +976,12 @@ class ModernApp:
     def logout(self):
         """Выход из системы"""
         self.current_user = None
+        
+        # Данные пользователя не должны оставаться в скрытом фрейме
+        for widget in self.main_area.winfo_children():
+            widget.destroy()
+        self.login_username.delete(0, 'end')
+        
         self.show_login_frame()
     
     def run(self):
@@ -681,24 +998,34 @@ class BackupManager:
     """Менеджер резервных копий базы данных"""
     
     @staticmethod
-    def create_backup(db_name="users.db"):
+    def create_backup(db_name="users.db", suffix=""):
         """Создание резервной копии базы данных"""
         try:
             if os.path.exists(db_name):
-                backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                with open(db_name, 'rb') as src, open(backup_name, 'wb') as dst:
-                    dst.write(src.read())
+                backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}.db"
+                # Онлайн-бэкап SQLite: постранично, с блокировками и учётом WAL
+                src = sqlite3.connect(db_name)
+                dst = sqlite3.connect(backup_name)
+                try:
+                    src.backup(dst, pages=64)
+                finally:
+                    dst.close()
+                    src.close()
                 return True, f"Резервная копия создана: {backup_name}"
             return False, "Файл базы данных не найден"
         except Exception as e:
             return False, f"Ошибка создания резервной копии: {str(e)}"
 
-if __name__ == "__main__":
-    # Создание резервной копии при запуске
+def run_backup():
+    """Создание резервной копии с выводом результата"""
     success, message = BackupManager.create_backup()
     if success:
         print(message)
-    
+
+if __name__ == "__main__":
     # Запуск приложения
     app = ModernApp()
-    app.run()
\ No newline at end of file
+    
+    # Резервная копия создаётся в фоне после старта главного цикла, не задерживая окно
+    app.root.after(100, lambda: threading.Thread(target=run_backup, daemon=True).start())
+    app.run()